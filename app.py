@@ -1,36 +1,83 @@
 import os
 import json
-import random
-from datetime import datetime, timedelta, timezone
-from flask import Flask, request, jsonify
+import time
+import atexit
+import threading
+import numpy as np
+import orjson
+import msgpack
+from collections import deque
+from types import MappingProxyType
+from datetime import datetime, time as dtime, timedelta, timezone
+from flask import Flask, Response, request, jsonify, g
+from flask.json.provider import DefaultJSONProvider
+from flask_caching import Cache
 from dotenv import load_dotenv
 
-from kalai.utils.environmental import get_moon_phase, read_water_sensor_mock
-from kalai.model.rule_based_model import rule_based_activity_score
+from kalai.utils.environmental import (
+    get_moon_phase, read_water_sensor_mock, batch_uniform, batch_randint, batch_normal
+)
+from kalai.model.rule_based_model import rule_based_activity_score, rule_based_activity_scores_vec
 from kalai.model.lure_recommender import recommended_lures, feeding_mode
+from kalai.model.species import SpeciesRec, species_record
 
 load_dotenv()
 
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson; also serializes numpy arrays and scalars."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev_secret')
+cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 600})
 SPECIES_DB_PATH = os.path.join(os.path.dirname(__file__), 'data', 'species_db.json')
-USER_LOGS = [] 
+USER_LOGS_PATH = os.environ.get('USER_LOGS_PATH', os.path.join(os.path.dirname(__file__), 'data', 'user_logs.jsonl'))
+LOG_FLUSH_INTERVAL_S = 5
+USER_LOGS = deque(maxlen=10000)  # Most recent feedback, kept in memory
+_PENDING_LOGS = deque()  # Feedback not yet written to USER_LOGS_PATH; unbounded so a failed write never evicts entries
+_log_writer_pid = None
+_log_writer_lock = threading.Lock()
+_flush_lock = threading.Lock()
+
+# Simulated sun times (UTC); only the hours are reported, so they are constants rather than per-date datetimes
+SUNRISE = dtime(7, 30)
+SUNSET = dtime(16, 30)
 
 # --- Core Data Loading ---
 
+def _freeze(value):
+    """Recursively converts dicts to read-only MappingProxyType and lists to tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
 def load_species_db():
-    """Loads species data from local JSON file."""
+    """Loads species data once from local JSON file into an immutable mapping of SpeciesRec."""
     try:
-        with open(SPECIES_DB_PATH, 'r') as f:
-            return {sp['key']: sp for sp in json.load(f)}
+        with open(SPECIES_DB_PATH, 'rb') as f:
+            data = orjson.loads(f.read())
     except FileNotFoundError:
         print(f"Error: {SPECIES_DB_PATH} not found.")
-        return {}
+        return MappingProxyType({})
+    return MappingProxyType({sp['key']: species_record(_freeze(sp)) for sp in data})
 
 SPECIES_PROFILES = load_species_db()
 
 
-def get_species_profile(species_key: str) -> dict | None:
+def get_species_profile(species_key: str) -> SpeciesRec | None:
     return SPECIES_PROFILES.get(species_key.lower())
 
 def get_simulated_weather(lat: float, lon: float, dt: datetime = None) -> dict:
@@ -38,34 +85,138 @@ def get_simulated_weather(lat: float, lon: float, dt: datetime = None) -> dict:
     if dt is None:
         dt = datetime.now(timezone.utc)
     
-    sunrise = dt.replace(hour=7, minute=30, second=0, microsecond=0)
-    sunset = dt.replace(hour=16, minute=30, second=0, microsecond=0)
-    
 
     water_temp = read_water_sensor_mock() 
 
 
-    air_temp = water_temp + random.uniform(2.0, 5.0) 
-    moon_phase, moon_fraction = get_moon_phase(dt)
+    air_temp = water_temp + batch_uniform(2.0, 5.0)
+    moon_phase_id, moon_fraction, moon_phase = get_moon_phase(dt)
     
     return {
         "temp_c": round(air_temp, 1),
         "water_temp_c": round(water_temp, 1),
-        "wind_speed_ms": round(random.uniform(1.0, 7.0), 1),
-        "cloud_cover_percent": random.randint(30, 90),
-        "pressure_hpa": random.randint(1000, 1020),
-        "humidity_percent": random.randint(70, 90),
-        "sunrise_h": sunrise.hour,
-        "sunset_h": sunset.hour,
+        "wind_speed_ms": round(batch_uniform(1.0, 7.0), 1),
+        "cloud_cover_percent": int(batch_randint(30, 90)),
+        "pressure_hpa": int(batch_randint(1000, 1020)),
+        "humidity_percent": int(batch_randint(70, 90)),
+        "sunrise_h": SUNRISE.hour,
+        "sunset_h": SUNSET.hour,
         "current_time": dt.isoformat(),
         "moon_phase": moon_phase, 
+        "moon_phase_id": moon_phase_id,
         "moon_fraction": moon_fraction,
         "model_source": "SIMULATED_DATA"
     }
 
+def simulate_weather_batch(lat: float, lon: float, dt_start: datetime, n: int = 24) -> dict[str, np.ndarray]:
+    """Simulates n consecutive hourly forecasts in one pass, as arrays keyed like get_simulated_weather."""
+    hour_times = [dt_start + timedelta(hours=i) for i in range(n)]
+
+    # One sensor read per batch, with small hour-to-hour drift
+    water_temp = read_water_sensor_mock() + batch_normal(0.0, 0.3, n)
+    air_temp = water_temp + batch_uniform(2.0, 5.0, n)
+    moon = [get_moon_phase(dt_hour) for dt_hour in hour_times]
+
+    return {
+        "temp_c": np.round(air_temp, 1),
+        "water_temp_c": np.round(water_temp, 1),
+        "wind_speed_ms": np.round(batch_uniform(1.0, 7.0, n), 1),
+        "cloud_cover_percent": batch_randint(30, 90, n),
+        "pressure_hpa": batch_randint(1000, 1020, n),
+        "humidity_percent": batch_randint(70, 90, n),
+        "sunrise_h": np.full(n, SUNRISE.hour),
+        "sunset_h": np.full(n, SUNSET.hour),
+        "hour": np.array([dt_hour.hour for dt_hour in hour_times]),
+        "moon_phase_id": np.array([phase_id for phase_id, _, _ in moon]),
+        "moon_fraction": np.array([fraction for _, fraction, _ in moon]),
+    }
+
+# --- Response Caching ---
+
+def _grid_cell() -> str:
+    """Request location snapped to a 0.01° grid cell (about 1 km)."""
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    if lat is None or lon is None:
+        return "none"
+    return f"{round(lat, 2)},{round(lon, 2)}"
+
+def _nearby_key(*args, **kwargs) -> str:
+    return f"{request.path}:{_grid_cell()}:{_response_format()}"
+
+def _is_ok(response) -> bool:
+    """Only cache successful responses; error views return (response, status) tuples."""
+    return getattr(response, "status_code", None) == 200
+
+# --- Response Encoding ---
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+def _response_format() -> str:
+    """'msgpack' when the client prefers it over JSON (the Streamlit frontend does), else 'json'."""
+    best = request.accept_mimetypes.best_match(['application/json', MSGPACK_MIMETYPE])
+    return 'msgpack' if best == MSGPACK_MIMETYPE else 'json'
+
+def _respond(payload: dict) -> Response:
+    """Encodes a successful payload as MessagePack or JSON depending on the Accept header."""
+    if _response_format() == 'msgpack':
+        response = Response(msgpack.packb(payload), mimetype=MSGPACK_MIMETYPE)
+    else:
+        response = jsonify(payload)
+    response.vary.add('Accept')
+    return response
+
+# --- Feedback Log Write-Behind ---
+
+def _flush_logs():
+    """Appends all pending feedback entries to USER_LOGS_PATH with a single fsync."""
+    # Serialized so the atexit flush waits for a batch the writer thread is still writing
+    with _flush_lock:
+        batch = []
+        while _PENDING_LOGS:
+            batch.append(_PENDING_LOGS.popleft())
+        if not batch:
+            return
+
+        try:
+            with open(USER_LOGS_PATH, 'a') as f:
+                f.writelines(json.dumps(entry) + "\n" for entry in batch)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError:
+            # Requeue in original order ahead of anything appended meanwhile; retried on the next flush
+            _PENDING_LOGS.extendleft(reversed(batch))
+            raise
+
+def _log_writer():
+    while True:
+        time.sleep(LOG_FLUSH_INTERVAL_S)
+        try:
+            _flush_logs()
+        except OSError as e:
+            print(f"Error writing {USER_LOGS_PATH}: {e}")
+
+def _ensure_log_writer():
+    """Starts the writer thread on first use in each process, so forked workers get their own."""
+    global _log_writer_pid
+    if _log_writer_pid == os.getpid():
+        return
+    with _log_writer_lock:
+        if _log_writer_pid != os.getpid():
+            threading.Thread(target=_log_writer, name="kalai-log-writer", daemon=True).start()
+            _log_writer_pid = os.getpid()
+
+atexit.register(_flush_logs)
+
 # --- REST API Endpoints ---
 
+@app.before_request
+def _stamp_request_time():
+    """One tz-aware 'now' per request, shared by the cache key and the handlers."""
+    g.now = datetime.now(timezone.utc)
+
 @app.route('/nearby', methods=['GET'])
+@cache.cached(timeout=86400, make_cache_key=_nearby_key, response_filter=_is_ok)
 def nearby():
     """GET /nearby: Simulated Overpass API call."""
     lat = request.args.get('lat', 60.17, type=float)
@@ -75,42 +226,36 @@ def nearby():
         {"name": "Seurasaarenselkä", "lat": 60.176, "lon": 24.912, "tags": {"water": "bay"}, "distance_km": 3},
         {"name": "Vantaanjoki (River Vantaa)", "lat": 60.25, "lon": 24.90, "tags": {"water": "river"}, "distance_km": 15},
     ]
-    return jsonify({"waterbodies": waterbodies, "source": "SIMULATED_OVERPASS"})
+    return _respond({"waterbodies": waterbodies, "source": "SIMULATED_OVERPASS"})
 
-@app.route('/predict', methods=['GET'])
-def predict():
-    """GET /predict: Main prediction endpoint using Rule-Based Scorer."""
-    lat = request.args.get('lat', type=float)
-    lon = request.args.get('lon', type=float)
-    species_key = request.args.get('species', 'pike').lower()
-    
-    if lat is None or lon is None:
-        return jsonify({"error": "Missing 'lat' or 'lon' query parameters"}), 400
-        
+@cache.memoize(timeout=600, args_to_ignore=['current_time'])
+def _predict_payload(cell_lat: float, cell_lon: float, species_key: str, hour_bucket: str, current_time: datetime) -> dict:
+    """Location-independent part of /predict, reused within a 0.01° grid cell, species and UTC hour.
+
+    current_time is left out of the cache key; hour_bucket (its UTC hour) keys it instead.
+    """
     species_profile = get_species_profile(species_key)
-    if not species_profile:
-        return jsonify({"error": f"Species '{species_key}' not found."}), 404
+    weather_data = get_simulated_weather(cell_lat, cell_lon, current_time)
 
-    current_time = datetime.now(timezone.utc)
-    weather_data = get_simulated_weather(lat, lon, current_time)
+    # 1. Compute 24-hour windows (scored in one vectorized pass)
+    hour_times = [current_time + timedelta(hours=i) for i in range(24)]
+    hourly_weather = simulate_weather_batch(cell_lat, cell_lon, current_time, n=24)
+    hourly_scores = rule_based_activity_scores_vec(species_profile, hourly_weather, hourly_weather["hour"])
 
-    # 1. Compute 24-hour windows
-    best_time_windows = []
-    
-    for i in range(24):
-        dt_hour = current_time + timedelta(hours=i)
-        hourly_weather = get_simulated_weather(lat, lon, dt_hour)
-        score, _ = rule_based_activity_score(species_profile, hourly_weather, dt_hour)
-        
-        if score > 75:
-            best_time_windows.append({
-                "start": dt_hour.isoformat(),
-                "end": (dt_hour + timedelta(hours=1)).isoformat(),
-                "score": score
-            })
-            
-    best_time_windows.sort(key=lambda x: x['score'], reverse=True)
-    best_time_windows = best_time_windows[:3]
+    # Top 3 hours above 75; the rank key (score, then earliest hour) is unique so ties keep hour order
+    above = np.flatnonzero(hourly_scores > 75)
+    rank = hourly_scores[above] * len(hourly_scores) - above
+    top = np.argpartition(-rank, 2)[:3] if len(above) > 3 else np.arange(len(above))
+    top = above[top[np.argsort(-rank[top])]]
+
+    best_time_windows = [
+        {
+            "start": hour_times[i].isoformat(),
+            "end": (hour_times[i] + timedelta(hours=1)).isoformat(),
+            "score": int(hourly_scores[i])
+        }
+        for i in top
+    ]
 
     current_score, explanation = rule_based_activity_score(species_profile, weather_data, current_time)
 
@@ -126,10 +271,9 @@ def predict():
     activity_label = "high" if current_score > 75 else "medium" if current_score > 40 else "low"
 
     recommended = recommended_lures(species_profile, context, top_n=3)
-    
-    response = {
-      "location": {"lat": lat, "lon": lon},
-      "species": species_profile["key"],
+
+    return {
+      "species": species_profile.key,
       "activity_score": current_score,
       "activity_label": activity_label,
       "best_time_windows": best_time_windows,
@@ -139,12 +283,31 @@ def predict():
       "model_used": "rule_based"
     }
 
-    return jsonify(response)
+@app.route('/predict', methods=['GET'])
+def predict():
+    """GET /predict: Main prediction endpoint using Rule-Based Scorer."""
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    species_key = request.args.get('species', 'pike').lower()
+    
+    if lat is None or lon is None:
+        return jsonify({"error": "Missing 'lat' or 'lon' query parameters"}), 400
+        
+    if not get_species_profile(species_key):
+        return jsonify({"error": f"Species '{species_key}' not found."}), 404
+
+    prediction = _predict_payload(
+        round(lat, 2), round(lon, 2), species_key,
+        hour_bucket=g.now.strftime('%Y%m%d%H'), current_time=g.now
+    )
+    response = {"location": {"lat": lat, "lon": lon}, **prediction}
+
+    return _respond(response)
 
 
 @app.route('/feedback', methods=['POST'])
 def submit_feedback():
-    """POST /feedback: Logs user catch/no-catch data to in-memory list."""
+    """POST /feedback: Logs user catch/no-catch data in memory; a background thread appends it to USER_LOGS_PATH."""
     data = request.get_json()
     if not all(k in data for k in ["lat", "lon", "species", "caught"]):
         return jsonify({"error": "Missing required fields in body"}), 400
@@ -154,7 +317,7 @@ def submit_feedback():
         return jsonify({"error": f"Species '{data['species']}' not found for logging."}), 404
         
     log_entry = {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": g.now.isoformat(),
         "species": data['species'],
         "caught": data['caught'],
         "notes": data.get('notes', ''),
@@ -162,6 +325,8 @@ def submit_feedback():
     }
     
     USER_LOGS.append(log_entry)
+    _PENDING_LOGS.append(log_entry)
+    _ensure_log_writer()
     
     return jsonify({
         "message": "Feedback logged successfully to in-memory logs.", 
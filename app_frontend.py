@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
 import requests
+import msgpack
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 from datetime import datetime, timedelta, timezone
 import random
@@ -9,6 +12,7 @@ from streamlit_folium import st_folium
 
 # --- Configuration ---
 BACKEND_URL = "http://localhost:5000"
+MSGPACK_MIMETYPE = "application/msgpack"
 DEFAULT_LAT = 60.17 # Helsinki, Finland coordinates
 DEFAULT_LON = 24.94
 
@@ -20,21 +24,58 @@ st.set_page_config(
 
 # --- Helper Functions for API Calls ---
 
-def api_call(endpoint, method="GET", params=None, json_data=None):
-    """Generic API caller with error handling."""
+@st.cache_resource
+def get_session():
+    """Pooled HTTP session, kept across Streamlit reruns so connections are reused."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=10,
+        max_retries=Retry(total=3, backoff_factor=0.1)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _request(endpoint, method="GET", params=None, json_data=None):
+    """Calls the backend and returns the decoded payload; raises on connection or HTTP errors."""
     url = f"{BACKEND_URL}/{endpoint}"
+    # Prefer the compact MessagePack encoding; endpoints without it answer in JSON
+    headers = {"Accept": f"{MSGPACK_MIMETYPE}, application/json;q=0.9"}
+    if method == "GET":
+        response = get_session().get(url, params=params, headers=headers)
+    elif method == "POST":
+        response = get_session().post(url, json=json_data, headers=headers)
+
+    response.raise_for_status()
+    if response.headers.get("Content-Type", "").startswith(MSGPACK_MIMETYPE):
+        return msgpack.unpackb(response.content)
+    return response.json()
+
+def _report_errors(fn, *args, **kwargs):
     try:
-        if method == "GET":
-            response = requests.get(url, params=params)
-        elif method == "POST":
-            response = requests.post(url, json=json_data)
-        
-        response.raise_for_status() 
-        return response.json()
+        return fn(*args, **kwargs)
     except requests.exceptions.RequestException as e:
         st.error(f"Error connecting to backend: Is the Flask server running? ({e})")
         return None
 
+def api_call(endpoint, method="GET", params=None, json_data=None):
+    """Generic API caller with error handling."""
+    return _report_errors(_request, endpoint, method, params, json_data)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_get(endpoint, **params):
+    # Failed calls raise, so errors are never cached
+    return _request(endpoint, params=params)
+
+def cached_nearby(lat, lon):
+    """/nearby with a 5 min cache; coordinates are rounded so float noise between reruns still hits it."""
+    return _report_errors(_cached_get, "nearby", lat=round(lat, 4), lon=round(lon, 4))
+
+def cached_predict(lat, lon, species):
+    """/predict with a 5 min cache, keyed like cached_nearby plus the species."""
+    return _report_errors(_cached_get, "predict", lat=round(lat, 4), lon=round(lon, 4), species=species)
+
 def get_species_list():
     
     return ["pike", "perch", "trout"]
@@ -74,7 +115,7 @@ tab1, tab2 = st.tabs(["🗺️ Map & Prediction", "📝 Log Catch"])
 
 with tab1:
     
-    nearby_data = api_call("nearby", params={"lat": st.session_state.lat, "lon": st.session_state.lon})
+    nearby_data = cached_nearby(st.session_state.lat, st.session_state.lon)
     if nearby_data:
         st.session_state.waterbodies = nearby_data.get('waterbodies', [])
     
@@ -116,7 +157,7 @@ with tab1:
     # 2. Prediction Results
     st.subheader("KalAI Prediction")
     
-    result = api_call("predict", params={"lat": st.session_state.lat, "lon": st.session_state.lon, "species": st.session_state.species})
+    result = cached_predict(st.session_state.lat, st.session_state.lon, st.session_state.species)
     
     if result:
         col1, col2, col3 = st.columns(3)
@@ -0,0 +1,18 @@
+# Gunicorn settings for the KalAI backend: gunicorn -c gunicorn_conf.py app:app
+import multiprocessing
+import os
+
+bind = os.environ.get("KALAI_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = 4
+
+# Import app.py once in the master so SPECIES_PROFILES (and the compiled scoring kernel)
+# are shared copy-on-write by every worker instead of being rebuilt per process
+preload_app = True
+
+def post_fork(server, worker):
+    # Each worker appends feedback to its own JSONL file so concurrent flushes never interleave
+    import app
+    root, ext = os.path.splitext(app.USER_LOGS_PATH)
+    app.USER_LOGS_PATH = f"{root}.{worker.pid}{ext}"
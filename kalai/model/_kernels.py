@@ -0,0 +1,65 @@
+# Compiled scoring kernel for the hourly forecast. Numba is optional: without it
+# HAVE_NUMBA is False and the rule-based model stays on its NumPy path.
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+_SIGNATURE = "int32[:](float64[:], float64[:], float64[:], float64[:], float64[:], float64[:], float64[:], float64[:], float64, float64, float64[:])"
+
+def _score_kernel_py(water_temps, hours, sunrise, sunset, winds, clouds, moon_mults, prefs, low, high, weights):
+    """Per-hour rule-based scores; mirrors rule_based_activity_score step for step.
+
+    `prefs` is indexed dawn/day/dusk/night and `weights` holds the
+    temperature/time_of_day/moon_phase/wind_speed weights in that order.
+    """
+    n = water_temps.shape[0]
+    out = np.empty(n, dtype=np.int32)
+
+    for i in range(n):
+        # --- 1. Temperature ---
+        water_temp = water_temps[i]
+        if low <= water_temp <= high:
+            temp_score = weights[0]
+        elif (low - 3) <= water_temp <= (high + 3):
+            temp_score = weights[0] * 0.75
+        else:
+            temp_score = weights[0] * 0.2
+
+        # --- 2. Time of day ---
+        hour = hours[i]
+        if (sunrise[i] - 2) <= hour < sunrise[i]:
+            slot = 0
+        elif sunrise[i] <= hour < sunset[i]:
+            slot = 1
+        elif sunset[i] <= hour < (sunset[i] + 2):
+            slot = 2
+        else:
+            slot = 3
+        time_score = (prefs[slot] / 100) * weights[1]
+
+        # --- 3. Moon phase ---
+        moon_score = weights[2] * moon_mults[i] * 0.5
+
+        # --- 4. Wind/weather ---
+        wind_score = 0.0
+        if 1.5 <= winds[i] <= 5.0:
+            wind_score += 5
+        if clouds[i] >= 75:
+            wind_score += 5
+        wind_score = min(weights[3], max(0.0, wind_score))
+
+        score = temp_score + time_score + moon_score + wind_score
+        out[i] = int(min(100.0, max(0.0, score)))
+
+    return out
+
+if HAVE_NUMBA:
+    # Eager compilation against an explicit signature (cached on disk) keeps JIT cost off the first request.
+    # fastmath is left off so results truncate exactly like the scalar scorer.
+    _score_kernel = njit(_SIGNATURE, cache=True)(_score_kernel_py)
+else:
+    _score_kernel = None
@@ -1,39 +1,68 @@
 # This algorithm will reccomend the lure 
+from typing import NamedTuple, TYPE_CHECKING
+import numpy as np
 
-def feeding_mode(activity_score: int) -> str:
-    if activity_score > 75:
-        return "aggressive"
-    elif activity_score >= 40:
-        return "moderate"
-    else:
-        return "passive"
-    
-def score_lure(lure: dict, context: dict) -> int:
-    score = 20
+if TYPE_CHECKING:
+    from kalai.model.species import SpeciesRec
+
+FEEDING_MODES = ("passive", "moderate", "aggressive")
 
-    if context["feeding_mode"] in lure["best_modes"]:
-        score += 30
+class LureTables(NamedTuple):
+    """A species' lures as a feature matrix, one row per lure, for vectorized scoring.
 
-    if context["water_temp"] < 10 and lure["speed"] == "slow":
-        score += 15
-    elif context["water_temp"] >= 10 and lure["speed"] == "fast":
-        score += 10
+    Columns: one-hot best modes (FEEDING_MODES order), speed slow, speed fast,
+    visibility high, type reaction.
+    """
+    names: tuple
+    features: np.ndarray  # [L, 7] float64
+
+def feeding_mode(activity_score: int) -> str:
+    return FEEDING_MODES[int(activity_score >= 40) + int(activity_score > 75)]
+    
+def build_lure_tables(lures) -> LureTables:
+    """Precomputes the lure feature matrix once per species at load time."""
+    features = np.array([
+        [mode in lure["best_modes"] for mode in FEEDING_MODES] + [
+            lure["speed"] == "slow",
+            lure["speed"] == "fast",
+            lure["visibility"] == "high",
+            lure["type"] == "reaction",
+        ]
+        for lure in lures
+    ], dtype=np.float64).reshape(len(lures), len(FEEDING_MODES) + 4)
+    features.flags.writeable = False
+    return LureTables(names=tuple(lure["name"] for lure in lures), features=features)
 
-    if context["cloud_cover"] > 70 and lure["visibility"] == "high":
-        score += 15
+def score_lures_vec(tables: LureTables, mode_id: int, water_temp: float, cloud_cover: float, wind_speed: float) -> np.ndarray:
+    """Scores every lure at once (0-100), with the lure rules expressed as one context weight vector.
 
-    if context["wind_speed"] > 4 and lure["type"] == "reaction":
-        score += 10
+    Base 20; +30 if the lure suits the feeding mode; +15 for slow lures below 10°C or +10 for fast
+    lures at 10°C and above; +15 for high-visibility lures above 70% cloud; +10 for reaction lures
+    in wind above 4 m/s.
+    """
+    weights = np.zeros(tables.features.shape[1])
+    weights[mode_id] = 30
+    weights[3] = 15 if water_temp < 10 else 0
+    weights[4] = 10 if water_temp >= 10 else 0
+    weights[5] = 15 if cloud_cover > 70 else 0
+    weights[6] = 10 if wind_speed > 4 else 0
+    return np.minimum(20 + tables.features @ weights, 100).astype(int)
 
-    return min(score, 100)
+def recommended_lures(species_profile: "SpeciesRec", context: dict, top_n: int = 3) -> list:
+    tables = species_profile.lure_tables
+    scores = score_lures_vec(
+        tables, FEEDING_MODES.index(context["feeding_mode"]),
+        context["water_temp"], context["cloud_cover"], context["wind_speed"]
+    )
 
-def recommended_lures(species_profile: dict, context: dict, top_n: int = 3) -> list:
-    scored = []
+    n = len(scores)
+    top_n = min(top_n, n)
+    if top_n <= 0:
+        return []
 
-    for lure in species_profile.get("lures", []):
-        scored.append({
-            "name": lure["name"],
-            "confidence": score_lure(lure, context)
-        })
+    # Unique rank key (higher score, then earlier lure) keeps the old stable-sort tie order
+    rank = scores * n - np.arange(n)
+    top = np.argpartition(-rank, top_n - 1)[:top_n]
+    top = top[np.argsort(-rank[top])]
 
-    return sorted(scored, key=lambda x: x["confidence"], reverse=True)[:top_n]
\ No newline at end of file
+    return [{"name": tables.names[i], "confidence": int(scores[i])} for i in top]
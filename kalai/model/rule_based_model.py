@@ -1,5 +1,8 @@
 from datetime import datetime
-from kalai.utils.environmental import get_moon_phase, time_of_day_label
+import numpy as np
+from kalai.utils.environmental import get_moon_phase, time_of_day_label, TIME_OF_DAY_BY_BOUNDARY
+from kalai.model.species import SpeciesRec, TIME_SLOTS
+from kalai.model._kernels import HAVE_NUMBA, _score_kernel
 
 # Score Weights (Total 100 max)
 WEIGHTS = {
@@ -9,15 +12,34 @@ WEIGHTS = {
     "wind_speed": 10
 }
 
-# Mapping of Moon Phase to a simple multiplier (Solunar Theory)
-MOON_MULTIPLIERS = {
-    "New Moon": 1.15,
-    "Full Moon": 1.2,
-    "Waxing Gibbous": 1.1,
-    # Others are baseline or slightly lower
-}
+# Moon Phase multiplier indexed by phase id, see MOON_PHASE_NAMES (Solunar Theory)
+MOON_MULTIPLIERS = np.array([
+    1.15,  # New Moon
+    1.0,   # Waxing Crescent
+    1.0,   # First Quarter
+    1.1,   # Waxing Gibbous
+    1.2,   # Full Moon
+    1.0,   # Waning Gibbous
+    1.0,   # Last Quarter
+    1.0,   # Waning Crescent
+], dtype=np.float64)
+
+# WEIGHTS in the order the compiled kernel expects
+_KERNEL_WEIGHTS = np.array(
+    [WEIGHTS["temperature"], WEIGHTS["time_of_day"], WEIGHTS["moon_phase"], WEIGHTS["wind_speed"]],
+    dtype=np.float64,
+)
+
+# TIME_SLOTS index for each entry of TIME_OF_DAY_BY_BOUNDARY
+_SLOT_BY_BOUNDARY = np.array([TIME_SLOTS.index(label) for label in TIME_OF_DAY_BY_BOUNDARY])
 
-def rule_based_activity_score(species_profile: dict, weather_data: dict, current_time: datetime) -> tuple[int, str]:
+def _as_f64(values, n: int) -> np.ndarray:
+    """Writable float64 array of length n (scalars are broadcast) matching the kernel signature."""
+    out = np.empty(n, dtype=np.float64)
+    out[:] = values
+    return out
+
+def rule_based_activity_score(species_profile: SpeciesRec, weather_data: dict, current_time: datetime) -> tuple[int, str]:
     """Computes a deterministic activity score (0-100) and an explanation."""
     
     score = 0
@@ -25,8 +47,8 @@ def rule_based_activity_score(species_profile: dict, weather_data: dict, current
     
     # --- 1. Temperature Score (Weight: 40) ---
     water_temp = weather_data.get("water_temp_c", 15.0)
-    low = species_profile["best_temp_low"]
-    high = species_profile["best_temp_high"]
+    low = species_profile.low
+    high = species_profile.high
     
     if low <= water_temp <= high:
         temp_score = WEIGHTS["temperature"]
@@ -43,7 +65,7 @@ def rule_based_activity_score(species_profile: dict, weather_data: dict, current
     # --- 2. Time of Day Score (Weight: 30) ---
     current_h = current_time.hour
     time_label = time_of_day_label(current_h, weather_data["sunrise_h"], weather_data["sunset_h"])
-    time_base_score = species_profile["preferred_times_json"].get(time_label, 0)
+    time_base_score = species_profile.prefs[TIME_SLOTS.index(time_label)]
     
     time_score = (time_base_score / 100) * WEIGHTS["time_of_day"]
     
@@ -52,7 +74,7 @@ def rule_based_activity_score(species_profile: dict, weather_data: dict, current
     
     # --- 3. Moon Phase Score (Weight: 20) ---
     moon_phase = weather_data.get("moon_phase", "Waxing Gibbous")
-    moon_multiplier = MOON_MULTIPLIERS.get(moon_phase, 1.0)
+    moon_multiplier = MOON_MULTIPLIERS[weather_data.get("moon_phase_id", 3)]
     
     moon_score = WEIGHTS["moon_phase"] * moon_multiplier * 0.5 
     
@@ -76,9 +98,69 @@ def rule_based_activity_score(species_profile: dict, weather_data: dict, current
     final_score = int(min(100, max(0, score)))
     
     final_explanation = (
-        f"Prediction for **{species_profile['display_name']}**: "
+        f"Prediction for **{species_profile.display_name}**: "
         f"{explanations[0]}, {explanations[1]}, and the "
         f"{explanations[2].lower().replace('full moon', 'strong moon phase')}."
     )
     
-    return final_score, final_explanation
\ No newline at end of file
+    return final_score, final_explanation
+
+def rule_based_activity_scores_vec(species_profile: SpeciesRec, weather_arrays: dict, hours: np.ndarray) -> np.ndarray:
+    """Vectorized `rule_based_activity_score` over many hours at once; returns an int array of scores (0-100).
+
+    Runs the compiled Numba kernel when available, otherwise the NumPy expressions below.
+    """
+    hours = np.asarray(hours)
+    moon_multiplier = np.take(MOON_MULTIPLIERS, weather_arrays["moon_phase_id"])
+
+    if HAVE_NUMBA:
+        n = hours.shape[0]
+        return _score_kernel(
+            _as_f64(weather_arrays["water_temp_c"], n), _as_f64(hours, n),
+            _as_f64(weather_arrays["sunrise_h"], n), _as_f64(weather_arrays["sunset_h"], n),
+            _as_f64(weather_arrays["wind_speed_ms"], n), _as_f64(weather_arrays["cloud_cover_percent"], n),
+            _as_f64(moon_multiplier, n), species_profile.prefs.astype(np.float64),
+            species_profile.low, species_profile.high, _KERNEL_WEIGHTS,
+        )
+
+    # --- 1. Temperature Score (Weight: 40) ---
+    water_temp = np.asarray(weather_arrays["water_temp_c"], dtype=np.float64)
+    low = species_profile.low
+    high = species_profile.high
+
+    temp_score = np.where(
+        (water_temp >= low) & (water_temp <= high),
+        WEIGHTS["temperature"],
+        np.where(
+            (water_temp >= low - 3) & (water_temp <= high + 3),
+            WEIGHTS["temperature"] * 0.75,
+            WEIGHTS["temperature"] * 0.2,
+        ),
+    )
+
+    # --- 2. Time of Day Score (Weight: 30) ---
+    sunrise_h = np.asarray(weather_arrays["sunrise_h"])
+    sunset_h = np.asarray(weather_arrays["sunset_h"])
+
+    # Same boundary count as time_of_day_label, mapped onto TIME_SLOTS indices
+    passed = (
+        (hours >= sunrise_h - 2).astype(np.intp) + (hours >= sunrise_h)
+        + (hours >= sunset_h) + (hours >= sunset_h + 2)
+    )
+    time_idx = _SLOT_BY_BOUNDARY[passed]
+    time_base_score = species_profile.prefs[time_idx]
+    time_score = (time_base_score / 100) * WEIGHTS["time_of_day"]
+
+    # --- 3. Moon Phase Score (Weight: 20) ---
+    moon_score = WEIGHTS["moon_phase"] * moon_multiplier * 0.5
+
+    # --- 4. Wind/Weather Score (Weight: 10) ---
+    wind_speed = np.asarray(weather_arrays["wind_speed_ms"], dtype=np.float64)
+    cloud_cover = np.asarray(weather_arrays["cloud_cover_percent"])
+
+    wind_score = np.where((wind_speed >= 1.5) & (wind_speed <= 5.0), 5, 0) + np.where(cloud_cover >= 75, 5, 0)
+    wind_score = np.clip(wind_score, 0, WEIGHTS["wind_speed"])
+
+    # Same summation order as the scalar scorer so both paths truncate identically
+    score = temp_score + time_score + moon_score + wind_score
+    return np.clip(score, 0, 100).astype(int)
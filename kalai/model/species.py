@@ -0,0 +1,29 @@
+from typing import NamedTuple
+import numpy as np
+from kalai.model.lure_recommender import LureTables, build_lure_tables
+
+# Order of the preferred-time slots in SpeciesRec.prefs
+TIME_SLOTS = ("dawn", "day", "dusk", "night")
+
+class SpeciesRec(NamedTuple):
+    """Species profile with the scorer's numeric fields precomputed at load time."""
+    key: str
+    display_name: str
+    low: float
+    high: float
+    prefs: np.ndarray  # Preferred-time scores (0-100) indexed like TIME_SLOTS
+    lure_tables: LureTables
+
+def species_record(sp: dict) -> SpeciesRec:
+    """Builds a SpeciesRec from a raw species_db.json entry."""
+    preferred = sp.get("preferred_times_json", {})
+    prefs = np.array([preferred.get(slot, 0) for slot in TIME_SLOTS])
+    prefs.flags.writeable = False
+    return SpeciesRec(
+        key=sp["key"],
+        display_name=sp["display_name"],
+        low=float(sp["best_temp_low"]),
+        high=float(sp["best_temp_high"]),
+        prefs=prefs,
+        lure_tables=build_lure_tables(sp.get("lures", [])),
+    )
@@ -1,59 +1,99 @@
 import math
+import os
+from bisect import bisect_right
 from datetime import datetime, timezone
-import random
+from functools import lru_cache
+import numpy as np
 
-def get_moon_phase(dt: datetime) -> tuple[str, float]:
-    """Calculates the Moon Phase and illumination fraction for a given datetime (simplified)."""
+# Shared PCG64 generator for all simulated readings
+_RNG = np.random.default_rng()
 
-    known_new_moon = datetime(2000, 1, 6, 18, 14, tzinfo=timezone.utc)
-    dt_utc = dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
-    delta = dt_utc - known_new_moon
-    days_since_new_moon = delta.total_seconds() / 86400 
+def _reseed_rng():
+    # Forked children (e.g. preloaded gunicorn workers) would otherwise replay the parent's draws
+    global _RNG
+    _RNG = np.random.default_rng()
+
+os.register_at_fork(after_in_child=_reseed_rng)
+
+KNOWN_NEW_MOON = datetime(2000, 1, 6, 18, 14, tzinfo=timezone.utc)
+SYNODIC_MONTH_DAYS = 29.530588
+
+# Moon phase names indexed by phase id (0-7)
+MOON_PHASE_NAMES = (
+    "New Moon", "Waxing Crescent", "First Quarter", "Waxing Gibbous",
+    "Full Moon", "Waning Gibbous", "Last Quarter", "Waning Crescent",
+)
+
+# Upper bounds (days into the cycle) of each phase bucket; the last bucket wraps back to New Moon
+_BOUNDARIES = (1.84, 5.53, 9.22, 12.91, 16.6, 20.29, 23.98, 27.67)
+_PHASE_IDS = (0, 1, 2, 3, 4, 5, 6, 7, 0)
 
-    cycle_fraction = days_since_new_moon % 29.530588
+@lru_cache(maxsize=4096)
+def _moon_for_date(ordinal: int) -> tuple[int, float, str]:
+    """Moon phase and illumination for a UTC calendar day, evaluated at noon."""
+    noon = datetime.fromordinal(ordinal).replace(hour=12, tzinfo=timezone.utc)
+    days_since_new_moon = (noon - KNOWN_NEW_MOON).total_seconds() / 86400
+
+    cycle_fraction = days_since_new_moon % SYNODIC_MONTH_DAYS
     
     # Approximate illumination fraction (0.0 to 1.0)
-    illumination_frac = 0.5 * (1 - math.cos(2 * math.pi * (cycle_fraction / 29.530588)))
-
-    # Determine phase name based on days passed
-    if 0 <= cycle_fraction < 1.84: phase = "New Moon"
-    elif 1.84 <= cycle_fraction < 5.53: phase = "Waxing Crescent"
-    elif 5.53 <= cycle_fraction < 9.22: phase = "First Quarter"
-    elif 9.22 <= cycle_fraction < 12.91: phase = "Waxing Gibbous"
-    elif 12.91 <= cycle_fraction < 16.6: phase = "Full Moon"
-    elif 16.6 <= cycle_fraction < 20.29: phase = "Waning Gibbous"
-    elif 20.29 <= cycle_fraction < 23.98: phase = "Last Quarter"
-    elif 23.98 <= cycle_fraction < 27.67: phase = "Waning Crescent"
-    else: phase = "New Moon"
-        
-    return phase, round(illumination_frac, 2)
+    illumination_frac = 0.5 * (1 - math.cos(2 * math.pi * (cycle_fraction / SYNODIC_MONTH_DAYS)))
+
+    phase_id = _PHASE_IDS[bisect_right(_BOUNDARIES, cycle_fraction)]
+    return phase_id, round(illumination_frac, 2), MOON_PHASE_NAMES[phase_id]
+
+def get_moon_phase(dt: datetime) -> tuple[int, float, str]:
+    """Calculates the Moon Phase id (see MOON_PHASE_NAMES), illumination fraction and phase name for a given datetime (simplified).
+
+    Resolution is one UTC day: the phase barely moves intraday, so results are cached per date.
+    """
+    dt_utc = dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+    return _moon_for_date(dt_utc.toordinal())
+
+# Time of day indexed by how many of the dawn/day/dusk/night boundaries an hour has passed
+TIME_OF_DAY_BY_BOUNDARY = ("night", "dawn", "day", "dusk", "night")
 
 def time_of_day_label(hour: int, sunrise_h: int, sunset_h: int) -> str:
     """Classifies the time of day into dawn/dusk/day/night."""
-    if (sunrise_h - 2) <= hour < sunrise_h:
-        return "dawn"
-    elif sunrise_h <= hour < sunset_h:
-        return "day"
-    elif sunset_h <= hour < (sunset_h + 2):
-        return "dusk"
-    else:
-        return "night"
+    passed = (
+        int(hour >= sunrise_h - 2) + int(hour >= sunrise_h)
+        + int(hour >= sunset_h) + int(hour >= sunset_h + 2)
+    )
+    return TIME_OF_DAY_BY_BOUNDARY[passed]
+
+# --- Random Draws ---
+def batch_uniform(low: float, high: float, n: int | None = None):
+    """n uniform floats in [low, high); a single float when n is None."""
+    return _RNG.uniform(low, high, n)
+
+def batch_randint(low: int, high: int, n: int | None = None):
+    """n uniform integers in [low, high], inclusive like random.randint."""
+    return _RNG.integers(low, high, n, endpoint=True)
+
+def batch_normal(mean: float, std: float, n: int | None = None):
+    """n normally distributed floats."""
+    return _RNG.normal(mean, std, n)
 
 # --- DS18B20 Sensor Simulation ---
+# Probe for the sensor once at import; off the Pi (no w1thermsensor, or no sensor attached) _SENSOR is None
+try:
+    from w1thermsensor import W1ThermSensor, W1ThermSensorError
+    _SENSOR_ERRORS = (W1ThermSensorError,)
+    _SENSOR = W1ThermSensor()
+except Exception:
+    _SENSOR = None
+    _SENSOR_ERRORS = ()
+
 def read_water_sensor_mock() -> float:
     """
     Mocks reading the DS18B20 water temperature sensor. 
-    In a Raspberry Pi environment, this would use 'w1thermsensor'.
+    In a Raspberry Pi environment, this reads the sensor found at import via 'w1thermsensor'.
     """
-    try:
-
-        from w1thermsensor import W1ThermSensor, NoSensorFoundError
+    if _SENSOR is not None:
         try:
-            sensor = W1ThermSensor()
-            temp_c = sensor.get_temperature()
-            return round(temp_c, 1)
-        except NoSensorFoundError:
-            return round(random.uniform(8.0, 18.0), 1)
-    except (ImportError):
-        # Fallback to simulated data (8.0 to 18.0 C range for freshwater)
-        return round(random.uniform(8.0, 18.0), 1)
\ No newline at end of file
+            return round(_SENSOR.get_temperature(), 1)
+        except _SENSOR_ERRORS:
+            # Sensor unplugged or not ready since startup (NoSensorFoundError, SensorNotReadyError, ...)
+            pass
+    # Fallback to simulated data (8.0 to 18.0 C range for freshwater)
+    return round(float(_RNG.uniform(8.0, 18.0)), 1)